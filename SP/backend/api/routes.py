@@ -1,4 +1,4 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request
 from services.stock_service import StockService
 from services.prediction_service import PredictionService
 from models.prediction_model import PredictionModel
@@ -11,6 +11,10 @@ prediction_model = PredictionModel()
 prediction_service = PredictionService(prediction_model)
 model_explainer = ModelExplainer(prediction_model)
 
+def _json_success(payload):
+    """Wrap pre-serialized JSON bytes in the success envelope without re-encoding them"""
+    return Response(b'{"success":true,"data":' + payload + b'}', mimetype='application/json')
+
 @api_blueprint.route('/stocks', methods=['GET'])
 def get_stocks():
     """Get a list of stocks based on query parameters"""
@@ -90,11 +94,8 @@ def predict_stock(symbol):
 def get_market_summary():
     """Get summary of the overall market"""
     try:
-        summary = stock_service.get_market_summary()
-        return jsonify({
-            'success': True,
-            'data': summary
-        })
+        summary = stock_service.get_market_summary_json()
+        return _json_success(summary)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -124,11 +125,8 @@ def get_most_watched():
     limit = request.args.get('limit', 5, type=int)
     
     try:
-        watched = stock_service.get_most_watched(limit)
-        return jsonify({
-            'success': True,
-            'data': watched
-        })
+        watched = stock_service.get_most_watched_json(limit)
+        return _json_success(watched)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -1,15 +1,32 @@
 import pandas as pd
 import numpy as np
 import os
+import re
 import time
 import threading
+import heapq
+import itertools
+import functools
+import operator
+import json
 import yfinance as yf
 from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
 import logging
-import random
 import backoff
 
+try:
+    import redis
+except ImportError:  # Shared cache is optional; fall back to in-process only
+    redis = None
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder
+    orjson = None
+from concurrent.futures import ThreadPoolExecutor
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger('StockService')
@@ -17,6 +34,135 @@ logger = logging.getLogger('StockService')
 # Load environment variables
 load_dotenv()
 
+class TokenBucket:
+    """Thread-safe token bucket for pacing outgoing requests"""
+    
+    def __init__(self, rate, capacity):
+        self.rate = rate            # Tokens refilled per second
+        self.capacity = capacity    # Maximum burst size
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Take one token, blocking only while the bucket is empty"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+# Process-wide limiter for Yahoo Finance calls, shared by all worker threads
+_rate_limiter = TokenBucket(rate=5, capacity=10)
+
+# Seconds to wait on the optional shared cache before treating it as unavailable
+REDIS_TIMEOUT = 0.3
+
+# US equity markets keep Eastern Time, including its DST switches
+_ET = ZoneInfo("America/New_York")
+
+# Analyst grade patterns, compiled once and matched against lowercased grades
+_BUY_RE = re.compile(r'buy|outperform|overweight')
+_HOLD_RE = re.compile(r'hold|neutral|market perform')
+_SELL_RE = re.compile(r'sell|underperform|underweight')
+
+def _dumps(obj):
+    """Serialize a result to JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj).encode()
+
+def _loads(raw):
+    """Parse JSON bytes produced by _dumps"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+# Format of the timestamps stamped on every payload
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Last formatted timestamp as (epoch second, string)
+_timestamp_cache = (0, "")
+
+def _now_str():
+    """Current local time in TIMESTAMP_FORMAT, formatted at most once per second"""
+    global _timestamp_cache
+    now = int(time.time())
+    cached = _timestamp_cache
+    if cached[0] != now:
+        cached = (now, time.strftime(TIMESTAMP_FORMAT, time.localtime(now)))
+        _timestamp_cache = cached
+    return cached[1]
+
+# Static fallback for get_most_watched, built once rather than on every failure
+_MOCK_WATCHED_STOCKS = (
+    {"symbol": "AAPL", "name": "Apple Inc.", "price": 243.56, "change": 3.21, "percentChange": 1.34},
+    {"symbol": "MSFT", "name": "Microsoft Corporation", "price": 420.87, "change": -2.53, "percentChange": -0.60},
+    {"symbol": "GOOGL", "name": "Alphabet Inc.", "price": 187.63, "change": 1.75, "percentChange": 0.94},
+    {"symbol": "AMZN", "name": "Amazon.com Inc.", "price": 181.75, "change": 1.92, "percentChange": 1.07},
+    {"symbol": "TSLA", "name": "Tesla Inc.", "price": 178.22, "change": 6.50, "percentChange": 3.78}
+)
+
+def _load_names():
+    """Read the bundled symbol-to-name map"""
+    path = os.path.join(os.path.dirname(__file__), 'symbol_names.json')
+    with open(path, encoding='utf-8') as names_file:
+        return json.load(names_file)
+
+# Display names for the symbols the dashboards track, so they don't need an info request
+_NAMES = _load_names()
+
+# Width in seconds of the time buckets used to key the memoized Ticker.info calls
+MEMO_BUCKET_SECONDS = 30
+
+def _memo_bucket():
+    """Return the current time bucket for the memoized Ticker.info calls"""
+    return int(time.time() // MEMO_BUCKET_SECONDS)
+
+@functools.lru_cache(maxsize=512)
+def _cached_info(symbol, bucket):
+    """Memoized Ticker.info, shared across requests within a time bucket"""
+    _rate_limiter.acquire()
+    return yf.Ticker(symbol).info
+
+# Process-wide cache of each symbol's last two daily closes
+HISTORY_TTL = 30
+HISTORY_CACHE_SIZE = 512
+_history_cache = {}
+_history_lock = threading.Lock()
+
+# Batched downloads, keyed by (symbols, period) and kept for the same TTL
+_batch_cache = {}
+
+def _ttl_store(cache, key, value, now):
+    """Store a value in one of the HISTORY_TTL caches, pruning it at the size cap"""
+    with _history_lock:
+        if len(cache) >= HISTORY_CACHE_SIZE:
+            # Drop expired frames before growing past the size cap
+            for stale_key in [k for k, (ts, _) in cache.items() if now - ts >= HISTORY_TTL]:
+                del cache[stale_key]
+        cache[key] = (now, value)
+
+def _get_recent_history(symbol):
+    """Last two daily closes for a symbol, served from a TTL cache shared by all requests"""
+    now = time.time()
+    cached = _history_cache.get(symbol)
+    if cached and now - cached[0] < HISTORY_TTL:
+        return cached[1]
+    
+    _rate_limiter.acquire()
+    # Five days spans weekends and holidays; only the last two sessions are
+    # kept, so cached frames stay a couple of rows of a single column
+    hist = yf.Ticker(symbol).history(period="5d", interval="1d")[['Close']].dropna().tail(2)
+    
+    _ttl_store(_history_cache, symbol, hist, now)
+    return hist
+
 class StockService:
     """Service for interacting with stock market data sources using yfinance"""
     
@@ -35,7 +181,24 @@ class StockService:
             'market': 60         # 60 seconds for market data
         }
         
-        # Thread lock for database operations
+        # Expiry min-heaps of (expires_at, seq, cache_key) so cleanup only
+        # touches entries that are actually due; seq breaks ties between keys
+        self.expiry_heap = {cache_type: [] for cache_type in self.cache}
+        self._expiry_seq = itertools.count()
+        
+        # Optional Redis cache shared by all worker processes, with self.cache as L1
+        self._redis = self._connect_redis()
+        
+        # Last market summary and its serialized form, reused while the summary is cached
+        self._market_summary_json = (None, b'')
+        
+        # Long-lived pool for per-symbol yfinance calls that can't be batched,
+        # shared across requests so threads aren't spawned on every call
+        self.max_workers = 16
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='yfinance')
+        
+        # Cache reads and writes rely on atomic dict operations; the lock
+        # only serializes eviction in the cleanup thread
         self.lock = threading.Lock()
         
         # Start cache cleanup thread
@@ -55,6 +218,13 @@ class StockService:
             {"symbol": "JNJ", "name": "Johnson & Johnson"}
         ]
         
+        # Column-wise copies of popular_stocks, lowercased once so search
+        # fallbacks scan flat tuples instead of dicts
+        self._pop_symbols = tuple(stock['symbol'] for stock in self.popular_stocks)
+        self._pop_names = tuple(stock['name'] for stock in self.popular_stocks)
+        self._pop_symbols_lc = tuple(symbol.lower() for symbol in self._pop_symbols)
+        self._pop_names_lc = tuple(name.lower() for name in self._pop_names)
+        
     def _start_cleanup_thread(self):
         """Start a background thread to clean up expired cache"""
         def cleanup_task():
@@ -68,16 +238,232 @@ class StockService:
     def _cleanup_cache(self):
         """Remove expired entries from cache"""
         now = time.time()
-        with self.lock:
-            for cache_type, cache_data in self.cache.items():
-                expired_keys = [
-                    key for key, value in cache_data.items() 
-                    if now - value['timestamp'] > self.cache_ttl[cache_type]
-                ]
-                for key in expired_keys:
-                    if key in cache_data:
+        for cache_type, heap in self.expiry_heap.items():
+            cache_data = self.cache[cache_type]
+            ttl = self.cache_ttl[cache_type]
+            while True:
+                with self.lock:
+                    # Heap is ordered by expiry, so stop at the first live entry
+                    if not heap or heap[0][0] > now:
+                        break
+                    _, _, key = heapq.heappop(heap)
+                    entry = cache_data.get(key)
+                    # The key may have been refreshed since this heap entry was pushed
+                    if entry and now - entry['timestamp'] >= ttl:
                         del cache_data[key]
     
+    def _connect_redis(self):
+        """Connect to the shared Redis cache if REDIS_URL is configured"""
+        redis_url = os.environ.get('REDIS_URL')
+        if not redis_url:
+            return None
+        if redis is None:
+            logger.warning("REDIS_URL is set but redis is not installed; using in-process cache only")
+            return None
+        try:
+            # Short timeouts so an unreachable Redis degrades to a cache miss
+            # instead of stalling startup and every request
+            client = redis.Redis.from_url(
+                redis_url,
+                socket_connect_timeout=REDIS_TIMEOUT,
+                socket_timeout=REDIS_TIMEOUT
+            )
+            client.ping()
+            return client
+        except Exception as e:
+            logger.warning("Could not connect to Redis, using in-process cache only: %s", e)
+            return None
+    
+    def _get_cache(self, cache_type, cache_key, now):
+        """Return fresh cached data from the local or shared cache, or None"""
+        entry = self.cache[cache_type].get(cache_key)
+        if entry and now - entry['timestamp'] < self.cache_ttl[cache_type]:
+            return entry['data']
+        
+        if self._redis is not None:
+            try:
+                raw = self._redis.get(f"{cache_type}:{cache_key!r}")
+            except Exception as e:
+                logger.debug("Error reading shared cache: %s", e)
+                return None
+            if raw is not None:
+                # Redis expires entries itself; keep the original timestamp locally
+                entry = _loads(raw)
+                self.cache[cache_type][cache_key] = entry
+                self._schedule_expiry(cache_type, cache_key, entry['timestamp'])
+                return entry['data']
+        
+        return None
+    
+    def _set_cache(self, cache_type, cache_key, data, now):
+        """Store a cache entry and schedule its expiry"""
+        entry = {
+            'data': data,
+            'timestamp': now
+        }
+        self.cache[cache_type][cache_key] = entry
+        self._schedule_expiry(cache_type, cache_key, now)
+        
+        if self._redis is not None:
+            try:
+                self._redis.setex(
+                    f"{cache_type}:{cache_key!r}",
+                    self.cache_ttl[cache_type],
+                    _dumps(entry)
+                )
+            except Exception as e:
+                logger.debug("Error writing shared cache: %s", e)
+    
+    def _schedule_expiry(self, cache_type, cache_key, timestamp):
+        """Push a local cache entry onto its bucket's expiry heap"""
+        heapq.heappush(
+            self.expiry_heap[cache_type],
+            (timestamp + self.cache_ttl[cache_type], next(self._expiry_seq), cache_key)
+        )
+    
+    def _download_history(self, symbols, period="2d"):
+        """Fetch price history for several symbols in one batched request"""
+        # Repeat calls for the same batch within the TTL reuse the last download
+        cache_key = (tuple(symbols), period)
+        now = time.time()
+        cached = _batch_cache.get(cache_key)
+        if cached and now - cached[0] < HISTORY_TTL:
+            return cached[1]
+        
+        _rate_limiter.acquire()
+        hist = yf.download(
+            " ".join(symbols),
+            period=period,
+            group_by="ticker",
+            threads=True,
+            progress=False
+        )
+        
+        # Only closes are read downstream, so drop the other price fields right away
+        if isinstance(hist.columns, pd.MultiIndex):
+            hist = hist.xs('Close', axis=1, level=1, drop_level=False)
+        
+        _ttl_store(_batch_cache, cache_key, hist, now)
+        return hist
+    
+    def _filter_popular_stocks(self, query):
+        """Filter popular stocks whose symbol or name contains the query"""
+        q = query.lower()
+        matches = [
+            i for i, (symbol, name) in enumerate(zip(self._pop_symbols_lc, self._pop_names_lc))
+            if q in symbol or q in name
+        ]
+        # Only the matching rows are materialized back into dicts
+        return [{"symbol": self._pop_symbols[i], "name": self._pop_names[i]} for i in matches]
+    
+    def _looks_like_symbol(self, query):
+        """Check whether a query is shaped like a ticker, e.g. AAPL, BRK-B or SHOP.TO"""
+        base, _, suffix = query.partition('.')
+        base = base.lstrip('^').replace('-', '')
+        if not (0 < len(base) <= 5 and base.isalnum()):
+            return False
+        return not suffix or (len(suffix) <= 3 and suffix.isalpha())
+    
+    def _search_yahoo(self, query):
+        """Resolve a symbol-like query against Yahoo Finance"""
+        # Use yfinance tickers search
+        tickers = yf.Tickers(query)
+        
+        # If direct match failed, try searching with Yahoo Finance's search functionality
+        if not hasattr(tickers, 'tickers') or not tickers.tickers:
+            # Unfortunately yfinance doesn't have a direct search function
+            # We'll try a few variations of the query with common stock symbols
+            variations = [
+                query.upper(),  # Try exact uppercase match
+                query.upper() + ".TO",  # Try Toronto exchange
+                query.upper() + ".L",   # Try London exchange
+            ]
+            
+            results = []
+            for var in variations:
+                try:
+                    ticker = yf.Ticker(var)
+                    info = ticker.info
+                    if 'shortName' in info:
+                        results.append({
+                            "symbol": var,
+                            "name": info['shortName']
+                        })
+                except Exception as e:
+                    logger.debug("Error searching ticker %s: %s", var, e)
+                    
+            if not results:
+                # If no results found, filter popular stocks by query
+                results = self._filter_popular_stocks(query)
+        else:
+            # Process direct tickers match
+            results = []
+            for symbol, ticker in tickers.tickers.items():
+                try:
+                    info = ticker.info
+                    if 'shortName' in info:
+                        results.append({
+                            "symbol": symbol,
+                            "name": info['shortName']
+                        })
+                except Exception as e:
+                    logger.debug("Error getting info for %s: %s", symbol, e)
+                    # If we can't get the info, just use the symbol
+                    results.append({
+                        "symbol": symbol,
+                        "name": f"{symbol} Inc."
+                    })
+        
+        return results
+    
+    def _summarize_closes(self, hist, symbols):
+        """Compute rounded price, change and percent change for each symbol in a batched download"""
+        # Convert the Close columns to one array up front and look symbols up
+        # by column offset, instead of slicing a Series out of the frame each time
+        if isinstance(hist.columns, pd.MultiIndex):
+            close_frame = hist.xs('Close', axis=1, level=1)
+            offsets = close_frame.columns.get_indexer(symbols)
+            close_array = close_frame.to_numpy(dtype=np.float64)
+        else:
+            offsets = np.full(len(symbols), -1)
+            close_array = None
+        
+        # Stack the last two closes of every symbol the batch covered,
+        # filling preallocated slots by index
+        found = [None] * len(symbols)
+        found_count = 0
+        missing = []
+        add_missing = missing.append
+        last_two = np.empty((len(symbols), 2), dtype=np.float64)
+        for symbol, offset in zip(symbols, offsets.tolist()):
+            if offset >= 0:
+                closes = close_array[:, offset]
+                closes = closes[~np.isnan(closes)]
+            else:
+                closes = np.empty(0)
+            
+            if closes.size >= 2:
+                last_two[found_count] = closes[-2:]
+                found[found_count] = symbol
+                found_count += 1
+            else:
+                add_missing(symbol)
+        found = found[:found_count]
+        
+        # Compute price, change and percent change for all symbols into the rows
+        # of one buffer, writing in place so no temporaries are allocated
+        prev = last_two[:found_count, 0]
+        values = np.zeros((3, found_count), dtype=np.float64)
+        values[0] = last_two[:found_count, 1]
+        np.subtract(values[0], prev, out=values[1])
+        np.divide(values[1], prev, out=values[2], where=prev > 0)
+        values[2] *= 100
+        np.round(values, 2, out=values)
+        prices, changes, percent_changes = values.tolist()
+        
+        # Symbols the frame covered with their values, then the ones it was missing
+        return found, prices, changes, percent_changes, missing
+    
     @backoff.on_exception(backoff.expo, Exception, max_tries=3)
     def search_stocks(self, query, limit=10):
         """Search for stocks based on a query string with retry logic"""
@@ -86,113 +472,67 @@ class StockService:
             return self.popular_stocks[:limit]
         
         # Check cache first
-        cache_key = f"search_{query}_{limit}"
+        cache_key = (query, limit)
         now = time.time()
         
-        with self.lock:
-            if cache_key in self.cache['search'] and now - self.cache['search'][cache_key]['timestamp'] < self.cache_ttl['search']:
-                return self.cache['search'][cache_key]['data']
+        cached = self._get_cache('search', cache_key, now)
+        if cached is not None:
+            return cached
         
         try:
-            # Use yfinance tickers search
-            tickers = yf.Tickers(query)
-            
-            # If direct match failed, try searching with Yahoo Finance's search functionality
-            if not hasattr(tickers, 'tickers') or not tickers.tickers:
-                # Unfortunately yfinance doesn't have a direct search function
-                # We'll try a few variations of the query with common stock symbols
-                variations = [
-                    query.upper(),  # Try exact uppercase match
-                    query.upper() + ".TO",  # Try Toronto exchange
-                    query.upper() + ".L",   # Try London exchange
-                ]
-                
-                results = []
-                for var in variations:
-                    try:
-                        ticker = yf.Ticker(var)
-                        info = ticker.info
-                        if 'shortName' in info:
-                            results.append({
-                                "symbol": var,
-                                "name": info['shortName']
-                            })
-                    except Exception as e:
-                        logger.debug(f"Error searching ticker {var}: {e}")
-                        
-                if not results:
-                    # If no results found, filter popular stocks by query
-                    results = [
-                        stock for stock in self.popular_stocks 
-                        if query.lower() in stock['symbol'].lower() or query.lower() in stock['name'].lower()
-                    ]
-            else:
-                # Process direct tickers match
-                results = []
-                for symbol, ticker in tickers.tickers.items():
-                    try:
-                        info = ticker.info
-                        if 'shortName' in info:
-                            results.append({
-                                "symbol": symbol,
-                                "name": info['shortName']
-                            })
-                    except Exception as e:
-                        logger.debug(f"Error getting info for {symbol}: {e}")
-                        # If we can't get the info, just use the symbol
-                        results.append({
-                            "symbol": symbol,
-                            "name": f"{symbol} Inc."
-                        })
+            results = None
+            if not self._looks_like_symbol(query):
+                # Free text such as "apple inc" can't be a ticker, so skip Yahoo entirely
+                results = self._filter_popular_stocks(query)
+            elif query != query.upper():
+                # Lowercase input is usually a name; only ask Yahoo when no popular stock matches
+                results = self._filter_popular_stocks(query) or None
+            
+            if results is None:
+                results = self._search_yahoo(query)
             
             # Cache the results
-            with self.lock:
-                self.cache['search'][cache_key] = {
-                    'data': results[:limit],
-                    'timestamp': now
-                }
+            self._set_cache('search', cache_key, results[:limit], now)
             
             return results[:limit]
             
         except Exception as e:
-            logger.error(f"Error searching stocks: {e}")
+            logger.error("Error searching stocks: %s", e)
             # If search fails, filter popular stocks by query
-            results = [
-                stock for stock in self.popular_stocks 
-                if query.lower() in stock['symbol'].lower() or query.lower() in stock['name'].lower()
-            ]
+            results = self._filter_popular_stocks(query)
             return results[:limit]
     
     @backoff.on_exception(backoff.expo, Exception, max_tries=3)
     def get_stock_details(self, symbol):
         """Get detailed real-time information about a specific stock"""
         # Check cache first
-        cache_key = f"details_{symbol}"
+        cache_key = symbol
         now = time.time()
         
-        with self.lock:
-            if cache_key in self.cache['realtime'] and now - self.cache['realtime'][cache_key]['timestamp'] < self.cache_ttl['realtime']:
-                return self.cache['realtime'][cache_key]['data']
+        cached = self._get_cache('realtime', cache_key, now)
+        if cached is not None:
+            return cached
         
         try:
-            # Add a small random delay to avoid hitting rate limits and database locks
-            time.sleep(random.uniform(0.1, 0.5))
-            
             # Get stock information from yfinance
             ticker = yf.Ticker(symbol)
-            info = ticker.info
+            info = _cached_info(symbol, _memo_bucket())
             
             # Get recent market data
-            hist = ticker.history(period="2d")
+            hist = _get_recent_history(symbol)
             
             # Calculate changes
-            if len(hist) >= 2:
-                current_price = hist['Close'].iloc[-1]
-                prev_close = hist['Close'].iloc[-2]
+            closes = hist['Close'].to_numpy()
+            
+            if len(closes) >= 2:
+                current_price = closes[-1]
+                prev_close = closes[-2]
                 change = current_price - prev_close
                 percent_change = (change / prev_close * 100) if prev_close > 0 else 0
             else:
-                current_price = info.get('currentPrice', info.get('regularMarketPrice', 0))
+                current_price = info.get('currentPrice')
+                if current_price is None:
+                    current_price = info.get('regularMarketPrice', 0)
                 prev_close = info.get('previousClose', current_price)
                 change = current_price - prev_close
                 percent_change = (change / prev_close * 100) if prev_close > 0 else 0
@@ -202,6 +542,7 @@ class StockService:
             analyst = {"buy": 0, "hold": 0, "sell": 0}
             
             try:
+                _rate_limiter.acquire()
                 recommendations = ticker.recommendations
                 
                 if recommendations is not None and not recommendations.empty:
@@ -209,26 +550,31 @@ class StockService:
                     
                     # Check if 'To Grade' column exists
                     if 'To Grade' in recent_recs.columns:
-                        for grade in recent_recs['To Grade']:
-                            if pd.isna(grade):  # Skip NaN values
-                                continue
-                                
-                            grade_lower = str(grade).lower()
-                            if 'buy' in grade_lower or 'outperform' in grade_lower or 'overweight' in grade_lower:
-                                analyst["buy"] += 1
-                            elif 'hold' in grade_lower or 'neutral' in grade_lower or 'market perform' in grade_lower:
-                                analyst["hold"] += 1
-                            elif 'sell' in grade_lower or 'underperform' in grade_lower or 'underweight' in grade_lower:
-                                analyst["sell"] += 1
+                        grades = recent_recs['To Grade'].dropna().astype(str).str.lower()
+                        buy_mask = grades.str.contains(_BUY_RE, na=False)
+                        # Each grade counts once, with buy taking precedence over hold over sell
+                        hold_mask = ~buy_mask & grades.str.contains(_HOLD_RE, na=False)
+                        sell_mask = ~(buy_mask | hold_mask) & grades.str.contains(_SELL_RE, na=False)
+                        
+                        analyst = {
+                            "buy": int(buy_mask.sum()),
+                            "hold": int(hold_mask.sum()),
+                            "sell": int(sell_mask.sum())
+                        }
             except Exception as e:
-                logger.debug(f"Error processing recommendations for {symbol}: {e}")
+                logger.debug("Error processing recommendations for %s: %s", symbol, e)
                 # Use default analyst values set above
             
-            # Process additional data
+            # Process additional data, looking up each info key only once
             market_cap = info.get('marketCap', 0) / 1e12  # in trillions
-            pe = info.get('trailingPE', info.get('forwardPE', 0))
+            pe = info.get('trailingPE')
+            if pe is None:
+                pe = info.get('forwardPE', 0)
             eps = info.get('trailingEps', 0)
-            dividend = info.get('dividendYield', 0) * 100 if info.get('dividendYield') else 0  # as percentage
+            dividend_yield = info.get('dividendYield')
+            dividend = dividend_yield * 100 if dividend_yield else 0  # as percentage
+            volume = info.get('volume', 0) * 1e-6  # in millions
+            avg_volume = info.get('averageVolume', 0) * 1e-6
             
             result = {
                 "symbol": symbol,
@@ -237,8 +583,8 @@ class StockService:
                 "change": change,
                 "percentChange": percent_change,
                 "marketCap": round(market_cap, 2),
-                "volume": round(info.get('volume', 0) / 1e6, 1),  # Volume in millions
-                "avgVolume": round(info.get('averageVolume', 0) / 1e6, 1),
+                "volume": round(volume, 1),
+                "avgVolume": round(avg_volume, 1),
                 "pe": round(pe, 1) if pe else 0,
                 "eps": round(eps, 2) if eps else 0,
                 "dividend": round(dividend, 2),
@@ -246,26 +592,22 @@ class StockService:
                 "low52w": info.get('fiftyTwoWeekLow', 0),
                 "open": info.get('open', 0),
                 "previousClose": prev_close,
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "timestamp": _now_str(),
                 "analyst": analyst
             }
             
             # Cache the result
-            with self.lock:
-                self.cache['realtime'][cache_key] = {
-                    'data': result,
-                    'timestamp': now
-                }
+            self._set_cache('realtime', cache_key, result, now)
             
             return result
         
         except Exception as e:
-            logger.error(f"Error getting stock details for {symbol}: {e}")
+            logger.error("Error getting stock details for %s: %s", symbol, e)
             # If API calls fail, try cached data before returning failure
-            with self.lock:
-                if cache_key in self.cache['realtime']:
-                    logger.info(f"Using cached data for {symbol}")
-                    return self.cache['realtime'][cache_key]['data']
+            entry = self.cache['realtime'].get(cache_key)
+            if entry:
+                logger.info("Using cached data for %s", symbol)
+                return entry['data']
             
             # If no cache, return basic mock data
             return {
@@ -284,7 +626,7 @@ class StockService:
                 "low52w": 100.0,
                 "open": 100.0,
                 "previousClose": 100.0,
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "timestamp": _now_str(),
                 "analyst": {"buy": 0, "hold": 0, "sell": 0}
             }
     
@@ -292,17 +634,14 @@ class StockService:
     def get_historical_data(self, symbol, timeframe='1m'):
         """Get historical price data with Yahoo Finance"""
         # Check cache first
-        cache_key = f"historical_{symbol}_{timeframe}"
+        cache_key = (symbol, timeframe)
         now = time.time()
         
-        with self.lock:
-            if cache_key in self.cache['historical'] and now - self.cache['historical'][cache_key]['timestamp'] < self.cache_ttl['historical']:
-                return self.cache['historical'][cache_key]['data']
+        cached = self._get_cache('historical', cache_key, now)
+        if cached is not None:
+            return cached
         
         try:
-            # Add a small random delay to avoid hitting rate limits and database locks
-            time.sleep(random.uniform(0.1, 0.5))
-            
             # Map timeframe to yfinance parameters
             if timeframe == '1d':
                 period = "1d"
@@ -330,6 +669,7 @@ class StockService:
                 date_format = '%Y'
             
             # Get data from yfinance
+            _rate_limiter.acquire()
             ticker = yf.Ticker(symbol)
             hist = ticker.history(period=period, interval=interval)
             
@@ -337,44 +677,41 @@ class StockService:
                 raise ValueError(f"No historical data returned for {symbol}")
             
             # Convert to lists for JSON
-            timestamps = hist.index.tolist()
-            prices = hist['Close'].tolist()
+            closes = hist['Close'].to_numpy(dtype=float)
+            # Round in one vectorized pass, mapping missing candles to None
+            prices = np.where(np.isnan(closes), None, np.round(closes, 2)).tolist()
             
-            # Format dates
-            if isinstance(timestamps[0], pd.Timestamp):
-                dates = [ts.strftime('%Y-%m-%d') for ts in timestamps]
-                labels = [ts.strftime(date_format) for ts in timestamps]
+            # Format dates over the whole index at once
+            if isinstance(hist.index, pd.DatetimeIndex):
+                dates = hist.index.strftime('%Y-%m-%d').tolist()
+                labels = hist.index.strftime(date_format).tolist()
             else:
                 # If timestamps are already strings
-                dates = timestamps
-                labels = timestamps
+                dates = hist.index.tolist()
+                labels = dates
             
             result = {
                 "symbol": symbol,
                 "timeframe": timeframe,
                 "labels": labels,
-                "data": [round(price, 2) if not pd.isna(price) else None for price in prices],
+                "data": prices,
                 "timestamps": dates,
-                "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "updated_at": _now_str(),
                 "updated_by": "lucifer0177"
             }
             
             # Cache the result
-            with self.lock:
-                self.cache['historical'][cache_key] = {
-                    'data': result,
-                    'timestamp': now
-                }
+            self._set_cache('historical', cache_key, result, now)
             
             return result
             
         except Exception as e:
-            logger.error(f"Error fetching historical data for {symbol}: {e}")
+            logger.error("Error fetching historical data for %s: %s", symbol, e)
             # If API calls fail, try cached data before failing
-            with self.lock:
-                if cache_key in self.cache['historical']:
-                    logger.info(f"Using cached historical data for {symbol}")
-                    return self.cache['historical'][cache_key]['data']
+            entry = self.cache['historical'].get(cache_key)
+            if entry:
+                logger.info("Using cached historical data for %s", symbol)
+                return entry['data']
             
             # Return mock data if no cache
             return self._get_mock_historical_data(symbol, timeframe)
@@ -417,18 +754,16 @@ class StockService:
         start_price = np.random.uniform(50, 500)
         volatility = np.random.uniform(0.01, 0.05)
         returns = np.random.normal(0, volatility, points)
-        prices = [start_price]
-        
-        for ret in returns[1:]:
-            prices.append(prices[-1] * (1 + ret))
+        # Compound the returns onto the start price in one vectorized pass
+        prices = np.cumprod(np.concatenate(([start_price], 1 + returns[1:])))
         
         return {
             "symbol": symbol,
             "timeframe": timeframe,
-            "labels": [ts.strftime(date_format) for ts in timestamps],
-            "data": [round(price, 2) for price in prices],
-            "timestamps": [ts.strftime("%Y-%m-%d") for ts in timestamps],
-            "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "labels": timestamps.strftime(date_format).tolist(),
+            "data": np.round(prices, 2).tolist(),
+            "timestamps": timestamps.strftime("%Y-%m-%d").tolist(),
+            "updated_at": end_date.strftime(TIMESTAMP_FORMAT),
             "updated_by": "mock_data"
         }
     
@@ -439,9 +774,9 @@ class StockService:
         cache_key = "market_summary"
         now = time.time()
         
-        with self.lock:
-            if cache_key in self.cache['market'] and now - self.cache['market'][cache_key]['timestamp'] < self.cache_ttl['market']:
-                return self.cache['market'][cache_key]['data']
+        cached = self._get_cache('market', cache_key, now)
+        if cached is not None:
+            return cached
         
         try:
             # Major indices with their Yahoo Finance symbols
@@ -466,52 +801,35 @@ class StockService:
                 "Real Estate": "XLRE"
             }
             
+            # Fetch indices and sectors together in a single batched request
+            symbols = list(indices_symbols.values()) + list(sector_symbols.values())
+            hist = self._download_history(symbols)
+            
+            found, prices, changes, percent_changes, _ = self._summarize_closes(hist, symbols)
+            quotes = {
+                symbol: (price, change, percent_change)
+                for symbol, price, change, percent_change in zip(found, prices, changes, percent_changes)
+            }
+            
             # Get data for indices
-            indices_data = []
-            for name, symbol in indices_symbols.items():
-                try:
-                    # Add a small random delay to avoid hitting rate limits and database locks
-                    time.sleep(random.uniform(0.1, 0.3))
-                    
-                    ticker = yf.Ticker(symbol)
-                    hist = ticker.history(period="2d")
-                    
-                    if len(hist) >= 2:
-                        current_price = hist['Close'].iloc[-1]
-                        prev_close = hist['Close'].iloc[-2]
-                        change = current_price - prev_close
-                        percent_change = (change / prev_close * 100) if prev_close > 0 else 0
-                        
-                        indices_data.append({
-                            "name": name,
-                            "value": round(current_price, 2),
-                            "change": round(change, 2),
-                            "percentChange": round(percent_change, 2)
-                        })
-                except Exception as e:
-                    logger.error(f"Error getting data for index {name}: {e}")
+            indices_data = [
+                {
+                    "name": name,
+                    "value": quotes[symbol][0],
+                    "change": quotes[symbol][1],
+                    "percentChange": quotes[symbol][2]
+                }
+                for name, symbol in indices_symbols.items() if symbol in quotes
+            ]
             
             # Get data for sectors
-            sector_performance = []
-            for name, symbol in sector_symbols.items():
-                try:
-                    # Add a small random delay to avoid hitting rate limits and database locks
-                    time.sleep(random.uniform(0.1, 0.3))
-                    
-                    ticker = yf.Ticker(symbol)
-                    hist = ticker.history(period="2d")
-                    
-                    if len(hist) >= 2:
-                        current_price = hist['Close'].iloc[-1]
-                        prev_close = hist['Close'].iloc[-2]
-                        percent_change = ((current_price - prev_close) / prev_close * 100) if prev_close > 0 else 0
-                        
-                        sector_performance.append({
-                            "name": name,
-                            "percentChange": round(percent_change, 2)
-                        })
-                except Exception as e:
-                    logger.error(f"Error getting data for sector {name}: {e}")
+            sector_performance = [
+                {
+                    "name": name,
+                    "percentChange": quotes[symbol][2]
+                }
+                for name, symbol in sector_symbols.items() if symbol in quotes
+            ]
             
             # Determine market status
             market_status = self._get_market_status()
@@ -520,43 +838,43 @@ class StockService:
                 "indices": indices_data,
                 "sectorPerformance": sector_performance,
                 "marketStatus": market_status,
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "timestamp": _now_str(),
                 "updatedBy": "lucifer0177"
             }
             
             # Cache the result
-            with self.lock:
-                self.cache['market'][cache_key] = {
-                    'data': result,
-                    'timestamp': now
-                }
+            self._set_cache('market', cache_key, result, now)
             
             return result
             
         except Exception as e:
-            logger.error(f"Error fetching market summary: {e}")
+            logger.error("Error fetching market summary: %s", e)
             # If API call fails, try cached data
-            with self.lock:
-                if cache_key in self.cache['market']:
-                    logger.info("Using cached market summary data")
-                    return self.cache['market'][cache_key]['data']
+            entry = self.cache['market'].get(cache_key)
+            if entry:
+                logger.info("Using cached market summary data")
+                return entry['data']
             
             # If no cache, return mock data
             return self._get_mock_market_summary()
     
+    def get_market_summary_json(self):
+        """Get market summary data serialized as JSON bytes"""
+        result = self.get_market_summary()
+        source, payload = self._market_summary_json
+        # Cache hits return the same dict, so only serialize when it changes
+        if result is not source:
+            payload = _dumps(result)
+            self._market_summary_json = (result, payload)
+        return payload
+    
     def _get_market_status(self):
         """Determine if the market is currently open"""
-        now = datetime.now()
-        weekday = now.weekday()  # 0-6 (Mon-Sun)
+        now = datetime.now(_ET)
         
-        # US market hours: 9:30 AM to 4:00 PM Eastern Time
-        if weekday < 5:  # Monday to Friday
-            # Convert current time to Eastern Time (rough approximation)
-            # Properly, you'd use pytz or equivalent
-            eastern_hour = (now.hour - 4) % 24  # UTC-4 for Eastern Time
-            
-            if 9 <= eastern_hour < 16 or (eastern_hour == 9 and now.minute >= 30):
-                return "open"
+        # US market hours: 9:30 AM to 4:00 PM Eastern Time, Monday to Friday
+        if now.weekday() < 5 and (now.hour, now.minute) >= (9, 30) and now.hour < 16:
+            return "open"
             
         return "closed"
     
@@ -582,20 +900,45 @@ class StockService:
                 {"name": "Real Estate", "percentChange": -0.65}
             ],
             "marketStatus": "closed",
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "timestamp": _now_str(),
             "updatedBy": "mock_data"
         }
     
+    def _get_stock_name(self, symbol):
+        """Look up the display name for a symbol, falling back to a generic one"""
+        name = _NAMES.get(symbol)
+        if name:
+            return name
+        try:
+            return _cached_info(symbol, _memo_bucket()).get('shortName', f"{symbol} Inc.")
+        except Exception as e:
+            logger.debug("Error getting name for %s: %s", symbol, e)
+            return f"{symbol} Inc."
+    
+    def _get_stock_names(self, symbols):
+        """Look up display names for several symbols, in order"""
+        names = [_NAMES.get(symbol) for symbol in symbols]
+        # Only symbols missing from the bundled map need an info request
+        unnamed = [i for i, name in enumerate(names) if not name]
+        if unnamed:
+            fetched = self._executor.map(self._get_stock_name, [symbols[i] for i in unnamed])
+            for i, name in zip(unnamed, fetched):
+                names[i] = name
+        return names
+    
     @backoff.on_exception(backoff.expo, Exception, max_tries=3)
     def get_market_movers(self, limit=5):
         """Get market movers (top gainers and losers) using yfinance"""
+        # Negative limits select nothing, so they share the empty result's cache entry
+        limit = max(limit, 0)
+        
         # Check cache
-        cache_key = f"movers_{limit}"
+        cache_key = limit
         now = time.time()
         
-        with self.lock:
-            if cache_key in self.cache['market'] and now - self.cache['market'][cache_key]['timestamp'] < self.cache_ttl['market']:
-                return self.cache['market'][cache_key]['data']
+        cached = self._get_cache('market', cache_key, now)
+        if cached is not None:
+            return cached
         
         try:
             # Get list of most active stocks
@@ -607,59 +950,48 @@ class StockService:
                 "DIS", "ADBE", "CRM", "NFLX", "INTC"
             ]
             
-            stock_data = []
-            for symbol in major_stocks:
-                try:
-                    # Add a small random delay to avoid hitting rate limits and database locks
-                    time.sleep(random.uniform(0.1, 0.3))
-                    
-                    ticker = yf.Ticker(symbol)
-                    hist = ticker.history(period="2d")
-                    info = ticker.info
-                    
-                    if len(hist) >= 2:
-                        current_price = hist['Close'].iloc[-1]
-                        prev_close = hist['Close'].iloc[-2]
-                        change = current_price - prev_close
-                        percent_change = (change / prev_close * 100) if prev_close > 0 else 0
-                        
-                        stock_data.append({
-                            "symbol": symbol,
-                            "name": info.get('shortName', f"{symbol} Inc."),
-                            "price": round(current_price, 2),
-                            "change": round(change, 2),
-                            "percentChange": round(percent_change, 2)
-                        })
-                except Exception as e:
-                    logger.error(f"Error getting data for {symbol}: {e}")
+            # Fetch the last two sessions for all symbols in a single batched request
+            hist = self._download_history(major_stocks)
+            
+            found, prices, changes, percent_changes, _ = self._summarize_closes(hist, major_stocks)
             
-            # Sort by percent change
-            gainers = sorted(stock_data, key=lambda x: x['percentChange'], reverse=True)[:limit]
-            losers = sorted(stock_data, key=lambda x: x['percentChange'])[:limit]
+            # Batched downloads carry prices only, so look up names separately
+            names = self._get_stock_names(found)
+            stock_data = [
+                {
+                    "symbol": symbol,
+                    "name": name,
+                    "price": price,
+                    "change": change,
+                    "percentChange": percent_change
+                }
+                for symbol, name, price, change, percent_change in zip(found, names, prices, changes, percent_changes)
+            ]
+            
+            # Pick top and bottom performers by percent change without a full sort
+            by_percent_change = operator.itemgetter('percentChange')
+            gainers = heapq.nlargest(limit, stock_data, key=by_percent_change)
+            losers = heapq.nsmallest(limit, stock_data, key=by_percent_change)
             
             result = {
                 "gainers": gainers,
                 "losers": losers,
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "timestamp": _now_str(),
                 "updatedBy": "lucifer0177"
             }
             
             # Cache the result
-            with self.lock:
-                self.cache['market'][cache_key] = {
-                    'data': result,
-                    'timestamp': now
-                }
+            self._set_cache('market', cache_key, result, now)
             
             return result
             
         except Exception as e:
-            logger.error(f"Error fetching market movers: {e}")
+            logger.error("Error fetching market movers: %s", e)
             # If API calls fail, try cached data
-            with self.lock:
-                if cache_key in self.cache['market']:
-                    logger.info("Using cached market movers data")
-                    return self.cache['market'][cache_key]['data']
+            entry = self.cache['market'].get(cache_key)
+            if entry:
+                logger.info("Using cached market movers data")
+                return entry['data']
             
             # If no cache, return mock data
             return {
@@ -677,61 +1009,109 @@ class StockService:
                     {"symbol": "JNJ", "name": "Johnson & Johnson", "price": 147.62, "change": -0.75, "percentChange": -0.51},
                     {"symbol": "V", "name": "Visa Inc", "price": 298.45, "change": -1.02, "percentChange": -0.34}
                 ],
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "timestamp": _now_str(),
                 "updatedBy": "mock_data"
             }
     
+    def _fetch_quote(self, symbol):
+        """Get the latest price and daily change for a single symbol"""
+        try:
+            hist = _get_recent_history(symbol)
+            
+            closes = hist['Close'].to_numpy()
+            
+            if closes.size >= 2:
+                current_price = float(closes[-1])
+                prev_close = float(closes[-2])
+                change = current_price - prev_close
+                percent_change = (change / prev_close * 100) if prev_close > 0 else 0
+                
+                return {
+                    "symbol": symbol,
+                    "name": self._get_stock_name(symbol),
+                    "price": round(current_price, 2),
+                    "change": round(change, 2),
+                    "percentChange": round(percent_change, 2)
+                }
+        except Exception as e:
+            logger.error("Error getting details for %s: %s", symbol, e)
+        
+        return None
+    
     def get_most_watched(self, limit=5):
         """Get most watched/popular stocks"""
         # In a real app, this would be based on user activity
         # For now, return data for popular tech stocks
         popular_symbols = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA", "NVDA", "META"]
         
+        # Check cache
+        cache_key = ("most_watched", limit)
+        now = time.time()
+        
+        cached = self._get_cache('market', cache_key, now)
+        if cached is not None:
+            return cached
+        
         try:
-            watched = []
-            for symbol in popular_symbols[:limit]:
-                try:
-                    # Add a small random delay to avoid hitting rate limits and database locks
-                    time.sleep(random.uniform(0.1, 0.3))
-                    
-                    ticker = yf.Ticker(symbol)
-                    hist = ticker.history(period="2d")
-                    info = ticker.info
-                    
-                    if len(hist) >= 2:
-                        current_price = hist['Close'].iloc[-1]
-                        prev_close = hist['Close'].iloc[-2]
-                        change = current_price - prev_close
-                        percent_change = (change / prev_close * 100) if prev_close > 0 else 0
-                        
-                        watched.append({
-                            "symbol": symbol,
-                            "name": info.get('shortName', f"{symbol} Inc."),
-                            "price": round(current_price, 2),
-                            "change": round(change, 2),
-                            "percentChange": round(percent_change, 2)
-                        })
-                except Exception as e:
-                    logger.error(f"Error getting details for {symbol}: {e}")
+            # Trim to the requested count before doing any per-symbol work
+            symbols = popular_symbols[:max(limit, 0)]
+            if not symbols:
+                return {
+                    "stocks": [],
+                    "timestamp": _now_str(),
+                    "updatedBy": "lucifer0177"
+                }
             
-            return {
-                "stocks": watched[:limit],
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            # Fetch the last two sessions for all symbols in a single batched request
+            hist = self._download_history(symbols)
+            
+            found, prices, changes, percent_changes, missing = self._summarize_closes(hist, symbols)
+            
+            # Fall back to per-ticker quotes for any symbol the batched frame
+            # didn't cover, fetching them while the names are looked up
+            fallbacks = self._executor.map(self._fetch_quote, missing)
+            names = self._get_stock_names(found)
+            quotes = {
+                symbol: {
+                    "symbol": symbol,
+                    "name": name,
+                    "price": price,
+                    "change": chg,
+                    "percentChange": pct
+                }
+                for symbol, name, price, chg, pct in zip(found, names, prices, changes, percent_changes)
+            }
+            for symbol, quote in zip(missing, fallbacks):
+                quotes[symbol] = quote
+            
+            watched = [quotes[symbol] for symbol in symbols if quotes.get(symbol)]
+            
+            result = {
+                "stocks": watched,
+                "timestamp": _now_str(),
                 "updatedBy": "lucifer0177"
             }
             
+            # Cache the result
+            self._set_cache('market', cache_key, result, now)
+            
+            return result
+            
         except Exception as e:
-            logger.error(f"Error fetching most watched: {e}")
+            logger.error("Error fetching most watched: %s", e)
+            # If API calls fail, try cached data
+            entry = self.cache['market'].get(cache_key)
+            if entry:
+                logger.info("Using cached most watched data")
+                return entry['data']
             
             # Return mock data on error
             return {
-                "stocks": [
-                    {"symbol": "AAPL", "name": "Apple Inc.", "price": 243.56, "change": 3.21, "percentChange": 1.34},
-                    {"symbol": "MSFT", "name": "Microsoft Corporation", "price": 420.87, "change": -2.53, "percentChange": -0.60},
-                    {"symbol": "GOOGL", "name": "Alphabet Inc.", "price": 187.63, "change": 1.75, "percentChange": 0.94},
-                    {"symbol": "AMZN", "name": "Amazon.com Inc.", "price": 181.75, "change": 1.92, "percentChange": 1.07},
-                    {"symbol": "TSLA", "name": "Tesla Inc.", "price": 178.22, "change": 6.50, "percentChange": 3.78}
-                ],
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "stocks": list(_MOCK_WATCHED_STOCKS),
+                "timestamp": _now_str(),
                 "updatedBy": "mock_data"
-            }
\ No newline at end of file
+            }
+    
+    def get_most_watched_json(self, limit=5):
+        """Get most watched stocks serialized as JSON bytes"""
+        return _dumps(self.get_most_watched(limit))
\ No newline at end of file